@@ -0,0 +1,89 @@
+import argparse, json, subprocess, sys
+from pathlib import Path
+
+root = str(Path(__file__).resolve().parent.parent)
+heavy_modules = ["requests", "psutil", "ruamel.yaml", "tqdm", "pathvalidate", "dotenv", "git"]
+scenarios = {
+    "exceptions": "from kometautils import Failed, TimeoutExpired",
+    "version": "from kometautils import Version",
+    "util": "from kometautils import util",
+    "yaml": "from kometautils import YAML",
+    "args": "from kometautils import KometaArgs",
+    "logger": "from kometautils import KometaLogger",
+    "all": "from kometautils import *",
+}
+light_scenarios = {
+    "exceptions": heavy_modules,
+    "version": heavy_modules,
+    "util": heavy_modules,
+    "yaml": [m for m in heavy_modules if m != "ruamel.yaml"],
+    "args": heavy_modules,
+    "logger": heavy_modules,
+}
+
+def import_time(statement):
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, cwd=root)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr)
+    total = 0
+    package = 0
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        indent = len(name) - len(name.lstrip())
+        name = name.strip()
+        if indent == 1:
+            total += int(cumulative)
+            if name == "kometautils" or name.startswith("kometautils."):
+                package += int(cumulative)
+    return total, package
+
+def loaded_modules(statement):
+    check = f"{statement}\nimport sys\nprint(','.join([m for m in {heavy_modules!r} if m in sys.modules]))"
+    process = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, cwd=root)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr)
+    return [m for m in process.stdout.strip().split(",") if m]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and guard the cold import time of kometautils")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per scenario (fastest is kept)")
+    parser.add_argument("-b", "--budget", type=float, default=None, help="Fail when the exceptions/version scenarios take longer than this many milliseconds")
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    parser.add_argument("-c", "--compare", help="Baseline JSON to compare against")
+    parser.add_argument("-t", "--threshold", type=float, default=1.5, help="Slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    print(f"{'Scenario':<12} {'Total':>10} {'kometautils':>12}  Heavy Modules Loaded")
+    for name, statement in scenarios.items():
+        runs = [import_time(statement) for _ in range(args.repeat)]
+        total, package = min(runs)
+        loaded = loaded_modules(statement)
+        results[name] = {"total_us": total, "package_us": package, "loaded": loaded}
+        print(f"{name:<12} {total / 1000:>8.2f}ms {package / 1000:>10.2f}ms  {', '.join(loaded) or '-'}")
+        if name in light_scenarios:
+            unexpected = [m for m in loaded if m in light_scenarios[name]]
+            if unexpected:
+                failures.append(f"{name} imports {', '.join(unexpected)}")
+        if args.budget and name in ["exceptions", "version"] and package / 1000 > args.budget:
+            failures.append(f"{name} took {package / 1000:.2f}ms (budget {args.budget:.2f}ms)")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        for name, result in results.items():
+            old = baseline.get(name, {}).get("package_us")
+            if old and result["package_us"] > old * args.threshold:
+                failures.append(f"{name}: {result['package_us'] / 1000:.2f}ms vs {old / 1000:.2f}ms ({result['package_us'] / old:.2f}x)")
+    if failures:
+        print("Failures:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("No Failures")
+
+if __name__ == "__main__":
+    main()
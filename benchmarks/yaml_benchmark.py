@@ -0,0 +1,177 @@
+import argparse, gc, io, json, platform, random, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kometautils import YAML
+from kometautils.util import format_bytes
+from kometautils.yaml import parse_cache
+
+genres = ["Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama", "Family", "Fantasy", "Horror", "Mystery", "Romance", "Thriller", "Western"]
+modes = {
+    "default": {},
+    "preserve_quotes": {"preserve_quotes": True},
+    "check_empty": {"check_empty": True},
+    "create": {"create": True},
+    "read_only": {"read_only": True},
+    "compact": {"compact": True},
+    "cache": {"cache": True},
+    "snapshot": {"snapshot": True},
+}
+warm_modes = ["cache", "snapshot"]
+
+def parse_size(size):
+    size = size.strip().upper()
+    for suffix, factor in [("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024), ("B", 1)]:
+        if size.endswith(suffix):
+            return int(float(size.removesuffix(suffix)) * factor)
+    return int(size)
+
+def metadata_entry(i, rng):
+    return [
+        f"  \"Movie Title {i}\":",
+        f"    title: \"Movie Title {i}\"",
+        f"    year: {rng.randint(1920, 2024)}",
+        f"    tmdb_id: {rng.randint(1, 999999)}",
+        f"    genre: [{', '.join(rng.sample(genres, 3))}]",
+        f"    summary: Synthetic summary for entry {i} with enough words to look like a real plot description.",
+        "    url_poster: https://image.tmdb.org/t/p/original/poster.jpg",
+    ]
+
+def collection_entry(i, rng):
+    return [
+        f"  Collection {i}:",
+        f"    tmdb_collection: {rng.randint(1, 999999)}",
+        "    sync_mode: sync",
+        f"    sort_title: \"!{i:05d}_Collection\"",
+        "    template:",
+        "      name: Standard",
+        f"      key: {rng.choice(genres).lower()}",
+    ]
+
+def generate(path, target, kind, seed=42):
+    rng = random.Random(seed)
+    lines = ["# Synthetic Kometa benchmark file", "metadata:" if kind == "metadata" else "collections:"]
+    size = sum(len(line) + 1 for line in lines)
+    i = 0
+    while size < target:
+        entry = metadata_entry(i, rng) if kind == "metadata" else collection_entry(i, rng)
+        size += sum(len(line) + 1 for line in entry)
+        lines.extend(entry)
+        i += 1
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return i
+
+def measure(func, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak, result
+
+def run_mode(path, mode, repeat):
+    options = modes[mode]
+    if mode in warm_modes:
+        YAML(path=path, **options)
+    setup = (lambda: path.unlink(missing_ok=True)) if mode == "create" else None
+    parse_time, parse_peak, loaded = measure(lambda: YAML(path=path, **options), repeat, setup=setup)
+    output = {"parse": parse_time, "parse_peak": parse_peak}
+    if not loaded.read_only:
+        dump_time, dump_peak, _ = measure(lambda: loaded.yaml.dump(loaded.data, io.StringIO()), repeat)
+        output["dump"] = dump_time
+        output["dump_peak"] = dump_peak
+        loaded["benchmark"] = 1
+        start = time.perf_counter()
+        loaded.save()
+        output["save"] = time.perf_counter() - start
+    return output
+
+def run_helpers(repeat, count=10000):
+    data_list = list(range(20))
+    data_dict = {f"key{i}": i for i in range(20)}
+    return {
+        "inline_list": measure(lambda: [YAML.inline(data_list) for _ in range(count)], repeat)[0] / count,
+        "inline_dict": measure(lambda: [YAML.inline(data_dict) for _ in range(count)], repeat)[0] / count,
+        "quote": measure(lambda: [YAML.quote("Movie Title") for _ in range(count)], repeat)[0] / count,
+    }
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, result in results["files"].items():
+        for mode, metrics in result["modes"].items():
+            for metric, value in metrics.items():
+                try:
+                    old = baseline["files"][key]["modes"][mode][metric]
+                except KeyError:
+                    continue
+                if old and value > old * threshold:
+                    regressions.append(f"{key} {mode} {metric}: {value:.4f} vs {old:.4f} ({value / old:.2f}x)")
+    for helper, value in results["helpers"].items():
+        old = baseline.get("helpers", {}).get(helper)
+        if old and value > old * threshold:
+            regressions.append(f"{helper}: {value * 1e6:.2f}us vs {old * 1e6:.2f}us ({value / old:.2f}x)")
+    return regressions
+
+def report(results):
+    print(f"{'File':<20} {'Mode':<16} {'Parse':>10} {'Parse Peak':>12} {'Dump':>10} {'Dump Peak':>12} {'Save':>10}")
+    for key, result in results["files"].items():
+        for mode, m in result["modes"].items():
+            dump = f"{m['dump']:.4f}s" if "dump" in m else "-"
+            dump_peak = format_bytes(m["dump_peak"]) if "dump_peak" in m else "-"
+            save = f"{m['save']:.4f}s" if "save" in m else "-"
+            print(f"{key:<20} {mode:<16} {m['parse']:>9.4f}s {format_bytes(m['parse_peak']):>12} {dump:>10} {dump_peak:>12} {save:>10}")
+    for helper, value in results["helpers"].items():
+        print(f"{helper:<37} {value * 1e6:>9.2f}us")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark kometautils.YAML load and save across file sizes and modes")
+    parser.add_argument("-s", "--sizes", default="10KB,100KB,1MB,10MB,50MB", help="Comma-separated file sizes to generate")
+    parser.add_argument("-k", "--kinds", default="config,metadata", help="Comma-separated file kinds (config, metadata)")
+    parser.add_argument("-m", "--modes", default=",".join(modes), help=f"Comma-separated modes ({', '.join(modes)})")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Runs per measurement (fastest is kept)")
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    parser.add_argument("-c", "--compare", help="Baseline JSON to compare against")
+    parser.add_argument("-t", "--threshold", type=float, default=1.25, help="Slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    selected = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in selected:
+        if mode not in modes:
+            parser.error(f"Unknown mode: {mode}")
+    results = {"python": platform.python_version(), "platform": platform.platform(), "files": {}, "helpers": run_helpers(args.repeat)}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for kind in [k.strip() for k in args.kinds.split(",") if k.strip()]:
+            for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+                key = f"{kind}-{size}"
+                path = Path(temp_dir) / f"{key}.yml"
+                entries = generate(path, parse_size(size), "metadata" if kind == "metadata" else "config")
+                results["files"][key] = {"bytes": path.stat().st_size, "entries": entries, "modes": {}}
+                for mode in selected:
+                    generate(path, parse_size(size), "metadata" if kind == "metadata" else "config")
+                    parse_cache.invalidate()
+                    results["files"][key]["modes"][mode] = run_mode(path, mode, args.repeat)
+    report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No Regressions")
+
+if __name__ == "__main__":
+    main()
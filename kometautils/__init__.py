@@ -1,15 +1,5 @@
-from importlib.metadata import version, PackageNotFoundError
-from . import util
-from .logging import KometaLogger
-from .args import KometaArgs, Version
+from importlib import import_module
 from .exceptions import Continue, Deleted, Failed, FilterFailed, LimitReached, NonExisting, NotScheduled, NotScheduledRange, TimeoutExpired
-from .yaml import YAML
-
-
-try:
-    __version__ = version("kometautils")
-except PackageNotFoundError:
-    __version__ = ""
 
 __author__ = "Nathan Taggart"
 __credits__ = "meisnate12"
@@ -32,5 +22,37 @@ __all__ = [
     "NotScheduled",
     "NotScheduledRange",
     "TimeoutExpired",
+    "LazyYAML",
     "YAML",
 ]
+
+_lazy_modules = ["args", "cache", "exceptions", "executor", "http", "limits", "logging", "monitor", "options", "util", "watch", "yaml"]
+_lazy_attributes = {
+    "KometaLogger": "logging",
+    "KometaArgs": "args",
+    "Version": "args",
+    "LazyYAML": "yaml",
+    "YAML": "yaml",
+}
+
+def _package_version():
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        return version("kometautils")
+    except PackageNotFoundError:
+        return ""
+
+def __getattr__(name):
+    if name in _lazy_modules:
+        return import_module(f".{name}", __name__)
+    elif name in _lazy_attributes:
+        value = getattr(import_module(f".{_lazy_attributes[name]}", __name__), name)
+    elif name == "__version__":
+        value = _package_version()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_modules) | set(_lazy_attributes) | {"__version__"})
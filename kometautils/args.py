@@ -1,8 +1,11 @@
-import argparse, os, platform, re, requests, uuid
-from dotenv import load_dotenv
+import json, os, platform, re, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor, wait
 from functools import cached_property
 from pathlib import Path
+from urllib.parse import urlencode
 from .exceptions import Failed
+from .options import compile_options, parse_bool
+from .util import atomic_write
 
 def parse_choice(env_str, default, arg_bool=False, arg_int=False):
     env_value = os.environ.get(env_str)
@@ -18,15 +21,64 @@ def parse_choice(env_str, default, arg_bool=False, arg_int=False):
     else:
         return str(env_value)
 
-def parse_bool(value, default=None):
-    if value is True or value is False:
-        return value
-    elif value.lower() in ["t", "true", "1", "y", "yes"]:
-        return True
-    elif value.lower() in ["f", "false", "0", "n", "no"]:
-        return False
+def find_git_dir(path="."):
+    dot_git = Path(path) / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    elif dot_git.is_file():
+        content = dot_git.read_text(encoding="utf-8").strip()
+        if content.startswith("gitdir:"):
+            git_dir = Path(content[7:].strip())
+            return git_dir if git_dir.is_absolute() else (Path(path) / git_dir).resolve()
+    return None
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def git_head(path=".", cache_path=None):
+    git_dir = find_git_dir(path)
+    if not git_dir:
+        return None
+    common_dir = git_dir
+    if (git_dir / "commondir").exists():
+        common_dir = (git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()).resolve()
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    ref = head[4:].strip() if head.startswith("ref:") else None
+    signature = [str(git_dir), head, _mtime(common_dir / "packed-refs")]
+    if ref:
+        signature.extend([_mtime(git_dir / ref), _mtime(common_dir / ref)])
+    if cache_path:
+        try:
+            with Path(cache_path).open(encoding="utf-8") as handle:
+                cache = json.load(handle)
+            if cache["signature"] == signature:
+                return cache["branch"], cache["commit"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    if ref:
+        branch = ref.removeprefix("refs/heads/") if ref.startswith("refs/heads/") else None
+        commit = None
+        for ref_dir in [git_dir, common_dir]:
+            if (ref_dir / ref).is_file():
+                commit = (ref_dir / ref).read_text(encoding="utf-8").strip()
+                break
+        if commit is None and (common_dir / "packed-refs").is_file():
+            with (common_dir / "packed-refs").open(encoding="utf-8") as handle:
+                for line in handle:
+                    if line.rstrip().endswith(f" {ref}"):
+                        commit = line.split(" ")[0]
+                        break
     else:
-        return default
+        branch, commit = None, head
+    if cache_path:
+        try:
+            atomic_write(cache_path, json.dumps({"signature": signature, "branch": branch, "commit": commit}))
+        except OSError:
+            pass
+    return branch, commit
 
 class Version:
     def __init__(self, original="Unknown", text="develop"):
@@ -72,34 +124,60 @@ class Version:
         return self.compare >= other.compare
 
 class KometaArgs:
-    def __init__(self, repo_name, base_dir, options, config_folder="config", use_nightly=True, running_nightly=False):
+    def __init__(self, repo_name, base_dir, options, config_folder="config", use_nightly=True, running_nightly=False, version_cache_ttl=3600, version_timeout=10,
+                 github_token=None, github_url="https://api.github.com", raw_url="https://raw.githubusercontent.com", strict=False):
         self.repo = repo_name
         self.base_dir = Path(base_dir)
+        self.config_dir = self.base_dir / config_folder if config_folder else self.base_dir
+        self.version_cache_ttl = version_cache_ttl
+        self.version_timeout = version_timeout
+        self.version_cache_path = self.config_dir / "version_cache.json"
+        self.github_cache_path = self.config_dir / "github_cache.json"
+        self.github_url = github_url.rstrip("/")
+        self.raw_url = raw_url.rstrip("/")
+        self._github_lock = threading.Lock()
+        self.github_cache_size = 50
+        self.github_max_pages = 10
+        self._version_deadline = None
+        self._version_thread = None
         self.options = options
         self.use_nightly = use_nightly
         self.running_nightly = running_nightly
-        self.original_choices = {}
-        self.choices = {}
-        parser = argparse.ArgumentParser()
-        if not isinstance(options, list):
-            raise ValueError("options must be a list")
-        for o in self.options:
-            for atr in ["type", "arg", "env", "key", "help", "default"]:
-                if atr not in o:
-                    raise AttributeError(f"{o} attribute must be in every option")
-            if o["type"] == "int":
-                parser.add_argument(f"-{o['arg']}", f"--{o['key']}", dest=o["key"], help=o["help"], type=int, default=o["default"])
-            elif o["type"] == "bool":
-                parser.add_argument(f"-{o['arg']}", f"--{o['key']}", dest=o["key"], help=o["help"], action="store_true", default=o["default"])
-            else:
-                parser.add_argument(f"-{o['arg']}", f"--{o['key']}", dest=o["key"], help=o["help"])
-        args_parsed = parser.parse_args()
-        load_dotenv(self.base_dir / config_folder / ".env" if config_folder else self.base_dir / ".env")
-
-        for o in self.options:
-            value = parse_choice(o["env"], getattr(args_parsed, o["key"]), arg_int=o["type"] == "int", arg_bool=o["type"] == "bool")
-            self.original_choices[o["key"]] = value
-            self.choices[o["key"]] = value
+        self.schema = compile_options(self.options)
+        self.args_parsed = self.schema.parse_args()
+        self.env_path = self.config_dir / ".env"
+        self._env_loaded = {}
+        self._load_env()
+
+        self.choices, self.errors = self.schema.resolve(self.args_parsed)
+        self.original_choices = dict(self.choices)
+        self._resolved = dict(self.choices)
+        if self.errors and strict:
+            raise Failed("Invalid Options:\n  " + "\n  ".join(self.errors))
+        self.github_token = github_token or os.environ.get("GITHUB_TOKEN")
+
+    def _load_env(self):
+        from dotenv import dotenv_values
+        values = dotenv_values(self.env_path) if self.env_path.exists() else {}
+        for key, value in self._env_loaded.items():
+            if key not in values and os.environ.get(key) == value:
+                del os.environ[key]
+        loaded = {}
+        for key, value in values.items():
+            if value is None or (key in os.environ and key not in self._env_loaded):
+                continue
+            os.environ[key] = value
+            loaded[key] = value
+        self._env_loaded = loaded
+
+    def reload(self):
+        self._load_env()
+        choices, self.errors = self.schema.resolve(self.args_parsed)
+        changes = {k: (self._resolved[k], v) for k, v in choices.items() if self._resolved[k] != v}
+        for key, (_, value) in changes.items():
+            self.choices[key] = value
+        self._resolved = choices
+        return changes
 
     def __getitem__(self, key):
         if key in self.choices:
@@ -112,11 +190,66 @@ class KometaArgs:
     def __contains__(self, key):
         return key in self.choices
 
-    def _github_request(self, path, repo=None, params=None):
-        response = requests.get(f"https://api.github.com/repos/{repo or self.repo}/{path}", params=params)
+    @cached_property
+    def github_cache(self):
+        try:
+            with self.github_cache_path.open(encoding="utf-8") as handle:
+                cache = json.load(handle)
+            if isinstance(cache, dict):
+                return cache
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_github_cache(self):
+        with self._github_lock:
+            while len(self.github_cache) > self.github_cache_size:
+                del self.github_cache[next(iter(self.github_cache))]
+            try:
+                atomic_write(self.github_cache_path, json.dumps(self.github_cache))
+            except OSError:
+                pass
+
+    def _github_get(self, url, params=None, save=True):
+        cache_key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.github_token:
+            headers["Authorization"] = f"Bearer {self.github_token}"
+        cached = self.github_cache.get(cache_key)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+        from . import http
+        response = http.get(url, params=params, headers=headers, timeout=self.version_timeout)
+        if response.status_code == 304 and cached:
+            return cached["data"], cached["next"]
         if response.status_code >= 400:
             raise Failed(f"({response.status_code} [{response.reason}]) {response.json()}")
-        return response.json()
+        data = response.json()
+        next_url = response.links.get("next", {}).get("url")
+        if etag := response.headers.get("ETag"):
+            with self._github_lock:
+                self.github_cache.pop(cache_key, None)
+                self.github_cache[cache_key] = {"etag": etag, "data": data, "next": next_url}
+            if save:
+                self._save_github_cache()
+        return data, next_url
+
+    def _github_request(self, path, repo=None, params=None):
+        return self._github_get(f"{self.github_url}/repos/{repo or self.repo}/{path}", params=params)[0]
+
+    def _github_pages(self, path, repo=None, params=None, max_pages=None):
+        url = f"{self.github_url}/repos/{repo or self.repo}/{path}"
+        params = {"per_page": 100, **(params or {})}
+        pages = 0
+        try:
+            while url and (max_pages is None or pages < max_pages):
+                data, url = self._github_get(url, params=params, save=False)
+                params = None
+                pages += 1
+                yield from data
+        finally:
+            if pages:
+                self._save_github_cache()
 
     def git_release_notes(self, repo=None):
         return self._github_request("releases/latest", repo=repo)["body"]
@@ -124,7 +257,7 @@ class KometaArgs:
     def git_commits(self, repo=None):
         master_sha = self._github_request("commits/master", repo=repo)["sha"]
         commits = []
-        for commit in self._github_request("commits", repo=repo, params={"sha": "nightly" if self.is_nightly else "develop"}):
+        for commit in self._github_pages("commits", repo=repo, params={"sha": "nightly" if self.is_nightly else "develop"}, max_pages=self.github_max_pages):
             if commit["sha"] == master_sha:
                 break
             message = commit["commit"]["message"]
@@ -135,15 +268,83 @@ class KometaArgs:
         return "\n".join(commits)
 
     def git_tags(self, repo=None):
-        return [r["ref"][11:] for r in self._github_request("git/refs/tags", repo=repo)]
+        return [r["ref"][11:] for r in self._github_pages("git/refs/tags", repo=repo)]
+
+    def _remaining(self):
+        if self._version_deadline is None:
+            return self.version_timeout
+        return max(self._version_deadline - time.monotonic(), 0)
+
+    def _concurrent(self, calls):
+        executor = ThreadPoolExecutor(max_workers=len(calls))
+        futures = {k: executor.submit(func, *args) for k, (func, args) in calls.items()}
+        done, _ = wait(futures.values(), timeout=self._remaining())
+        executor.shutdown(wait=False, cancel_futures=True)
+        return {k: f.result() if f in done and f.exception() is None else None for k, f in futures.items()}
+
+    def _read_version_cache(self):
+        if self.version_cache_ttl:
+            try:
+                with self.version_cache_path.open(encoding="utf-8") as handle:
+                    cache = json.load(handle)
+                if cache["repo"] == self.repo and time.time() - cache["time"] < self.version_cache_ttl:
+                    return cache
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        return None
+
+    def _write_version_cache(self, versions=None, notes=None):
+        if self.version_cache_ttl:
+            cache = self._read_version_cache() or {"repo": self.repo, "time": time.time(), "versions": {}, "notes": {}}
+            if versions:
+                cache["versions"].update(versions)
+            if notes:
+                cache["notes"].update(notes)
+            try:
+                atomic_write(self.version_cache_path, json.dumps(cache, indent=2))
+            except OSError:
+                pass
+
+    def check_version(self, background=False):
+        if not background:
+            self._check_version()
+        elif self._version_thread is None:
+            self._version_thread = threading.Thread(target=self._check_version, daemon=True)
+            self._version_thread.start()
+        return self._version_thread
+
+    def _check_version(self):
+        self._version_deadline = time.monotonic() + self.version_timeout
+        try:
+            self.update_notes # noqa
+        except Exception:
+            pass
+        finally:
+            self._version_deadline = None
+
+    def version_ready(self, timeout=None):
+        if self._version_thread is not None:
+            self._version_thread.join(timeout)
+            return not self._version_thread.is_alive()
+        return True
 
     @cached_property
     def update_notes(self):
         if self.update_version and self.local_version:
             if not self.update_version.same_master(self.local_version):
-                return self.git_release_notes()
+                notes_func = self.git_release_notes
             elif self.local_version.patch and self.local_version < self.update_version:
-                return self.git_commits()
+                notes_func = self.git_commits
+            else:
+                return None
+            notes_key = f"{self.local_version}>{self.update_version}"
+            cache = self._read_version_cache()
+            if cache and notes_key in cache["notes"]:
+                return cache["notes"][notes_key]
+            notes = self._concurrent({"notes": (notes_func, ())})["notes"]
+            if notes is not None:
+                self._write_version_cache(notes={notes_key: notes})
+            return notes
         return None
 
     @cached_property
@@ -187,24 +388,55 @@ class KometaArgs:
                     ver = Version(line)
         return ver
 
+    @cached_property
+    def version_levels(self):
+        levels = ["master", "develop"]
+        if self.use_nightly or self.running_nightly or "nightly" in [self.env_branch, self.local_branch]:
+            levels.append("nightly")
+        return levels
+
+    def _online_levels(self, levels):
+        cache = self._read_version_cache()
+        cached = cache["versions"] if cache else {}
+        versions = {level: Version(cached[level], text=level) for level in levels if level in cached}
+        missing = [level for level in levels if level not in versions]
+        if missing:
+            fetched = {level: v or Version() for level, v in self._concurrent({level: (self.online_version, (level,)) for level in missing}).items()}
+            known = {level: v.original for level, v in fetched.items() if v}
+            if known:
+                self._write_version_cache(versions=known)
+            versions.update(fetched)
+        return versions
+
+    @cached_property
+    def online_versions(self):
+        return self._online_levels(self.version_levels)
+
+    def _level_version(self, level):
+        if level not in self.online_versions:
+            self.online_versions.update(self._online_levels([level]))
+        return self.online_versions[level]
+
     @cached_property
     def nightly_version(self):
-        return self.online_version("nightly")
+        return self._level_version("nightly")
 
     @cached_property
     def develop_version(self):
-        return self.online_version("develop")
+        return self._level_version("develop")
 
     @cached_property
     def master_version(self):
-        return self.online_version("master")
+        return self._level_version("master")
 
     def online_version(self, level):
+        import requests
+        from . import http
         try:
-            response = requests.get(f"https://raw.githubusercontent.com/{self.repo}/{level}/VERSION")
+            response = http.get(f"{self.raw_url}/{self.repo}/{level}/VERSION", timeout=self.version_timeout)
             if response.status_code < 400:
                 return Version(response.content.decode().strip(), text=level)
-        except requests.exceptions.ConnectionError:
+        except requests.exceptions.RequestException:
             pass
         return Version()
 
@@ -223,12 +455,29 @@ class KometaArgs:
         return self.version if self.version and self.local_version < self.version else None
 
     @cached_property
-    def local_branch(self):
+    def git_info(self):
+        try:
+            info = git_head(cache_path=self.config_dir / "git_cache.json")
+            if info:
+                return info
+            elif not os.environ.get("GIT_DIR"):
+                return None, None
+        except (OSError, UnicodeDecodeError):
+            pass
         try:
             from git import Repo
-            return Repo(path=".").head.ref.name # noqa
+            repo = Repo(path=".")
+            return repo.head.ref.name, repo.head.commit.hexsha # noqa
         except Exception:
-            return None
+            return None, None
+
+    @cached_property
+    def local_branch(self):
+        return self.git_info[0]
+
+    @cached_property
+    def local_commit(self):
+        return self.git_info[1]
 
     @cached_property
     def env_branch(self):
@@ -0,0 +1,198 @@
+import atexit, pickle, re, sqlite3, threading, time, weakref
+from collections import OrderedDict
+from functools import wraps
+
+_missing = object()
+_default_repr = re.compile(r"<[^<>]* at 0x[0-9a-fA-F]+>")
+_open_caches = weakref.WeakSet()
+
+@atexit.register
+def _flush_open_caches():
+    for cache in list(_open_caches):
+        try:
+            cache.flush()
+        except sqlite3.Error:
+            pass
+
+class LRUCache:
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _missing)
+            if entry is not _missing:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while self.maxsize and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, _missing) is not _missing
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions, "expirations": self.expirations,
+                "size": len(self._data), "maxsize": self.maxsize, "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteCache:
+    def __init__(self, path, ttl=None, table="cache", batch_size=100, flush_interval=1):
+        self.path = str(path)
+        self.ttl = ttl
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self._pending = {}
+        self._flushed = time.monotonic()
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+        _open_caches.add(self)
+
+    @staticmethod
+    def _key(key):
+        key = repr(key)
+        if _default_repr.search(key):
+            raise ValueError(f"Cache Error: {key} contains an object without a stable repr and cannot be a persistent cache key")
+        return key
+
+    def get(self, key, default=None):
+        key = self._key(key)
+        with self._lock:
+            if key in self._pending:
+                entry = self._pending[key]
+            else:
+                entry = self._connection.execute(f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.time():
+                    self.hits += 1
+                    return pickle.loads(value)
+                self._pending[key] = None
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._pending[self._key(key)] = (pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time() + ttl if ttl else None)
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._flushed >= self.flush_interval:
+                self.flush()
+
+    def delete(self, key):
+        with self._lock:
+            self._pending[self._key(key)] = None
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                updates = [(k, v[0], v[1]) for k, v in self._pending.items() if v is not None]
+                deletes = [(k,) for k, v in self._pending.items() if v is None]
+                with self._connection:
+                    if updates:
+                        self._connection.executemany(f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?)", updates)
+                    if deletes:
+                        self._connection.executemany(f"DELETE FROM {self.table} WHERE key = ?", deletes)
+                self._pending.clear()
+            self._flushed = time.monotonic()
+
+    def clear(self, expired_only=False):
+        with self._lock:
+            self._pending.clear()
+            with self._connection:
+                if expired_only:
+                    self._connection.execute(f"DELETE FROM {self.table} WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+                else:
+                    self._connection.execute(f"DELETE FROM {self.table}")
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._connection.close()
+            _open_caches.discard(self)
+
+    def stats(self):
+        with self._lock:
+            self.flush()
+            total = self.hits + self.misses
+            size = self._connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            return {
+                "hits": self.hits, "misses": self.misses, "evictions": 0, "expirations": self.expirations,
+                "size": size, "maxsize": None, "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def memoize(cache=None, maxsize=1024, ttl=None, key=None):
+    def decorator(func):
+        store = LRUCache(maxsize=maxsize, ttl=ttl) if cache is None else cache
+        if isinstance(store, SQLiteCache) and key is None:
+            raise ValueError(f"Cache Error: memoize on {func.__qualname__} needs an explicit key function when using a SQLiteCache")
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                cache_key = (prefix, key(*args, **kwargs)) if key else (prefix, args, tuple(sorted(kwargs.items())))
+                value = store.get(cache_key, _missing)
+            except TypeError:
+                return func(*args, **kwargs)
+            if value is _missing:
+                value = func(*args, **kwargs)
+                store.set(cache_key, value)
+            return value
+
+        wrapper.cache = store
+        wrapper.cache_clear = store.clear
+        wrapper.cache_stats = store.stats
+        return wrapper
+    return decorator
@@ -0,0 +1,82 @@
+import os, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from .exceptions import Failed
+
+def _timed_call(func, item):
+    start = time.perf_counter()
+    try:
+        return True, func(item), time.perf_counter() - start
+    except Exception as e:
+        return False, e, time.perf_counter() - start
+
+class ParallelExecutor:
+    def __init__(self, logger=None, workers=None, processes=False, window=None, title=None, group=None, timing=None, raise_errors=False):
+        self.logger = logger
+        self.processes = processes
+        self.workers = workers or ((os.cpu_count() or 1) if processes else min(32, (os.cpu_count() or 1) + 4))
+        self.window = window or self.workers * 2
+        self.title = title or "Processing"
+        self.group = group
+        self.timing = timing or self.title
+        self.raise_errors = raise_errors
+        self.completed = 0
+        self.errors = []
+
+    def _progress(self, total):
+        if self.logger:
+            self.logger.ghost(f"{self.title}: {self.completed}/{total}" if total else f"{self.title}: {self.completed}")
+
+    def _handle(self, item, ok, result, elapsed, total):
+        self.completed += 1
+        if self.logger:
+            self.logger.timing(self.timing, elapsed)
+        self._progress(total)
+        if not ok:
+            self.errors.append((item, result))
+            if self.raise_errors:
+                raise result
+            if self.logger:
+                self.logger.error(str(result) if isinstance(result, Failed) else f"{self.title} Error: {item} {type(result).__name__}: {result}", group=self.group)
+
+    def map(self, func, items, ordered=True, total=None):
+        if total is None and hasattr(items, "__len__"):
+            total = len(items)
+        self.completed = 0
+        self.errors = []
+        items = iter(items)
+        pool = (ProcessPoolExecutor if self.processes else ThreadPoolExecutor)(max_workers=self.workers)
+        pending = deque() if ordered else {}
+
+        def submit():
+            for item in items:
+                future = pool.submit(_timed_call, func, item)
+                if ordered:
+                    pending.append((item, future))
+                else:
+                    pending[future] = item
+                if len(pending) >= self.window:
+                    break
+
+        try:
+            submit()
+            while pending:
+                if ordered:
+                    item, future = pending.popleft()
+                    done = [(item, future)]
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [(pending.pop(f), f) for f in finished]
+                for item, future in done:
+                    ok, result, elapsed = future.result()
+                    self._handle(item, ok, result, elapsed, total)
+                    yield item, result
+                submit()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            if self.logger:
+                self.logger.exorcise()
+
+def parallel_map(func, items, logger=None, workers=None, processes=False, ordered=True, window=None, title=None, group=None, timing=None, total=None, raise_errors=False):
+    executor = ParallelExecutor(logger=logger, workers=workers, processes=processes, window=window, title=title, group=group, timing=timing, raise_errors=raise_errors)
+    return executor.map(func, items, ordered=ordered, total=total)
@@ -0,0 +1,124 @@
+import requests, threading, time
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
+
+_session = None
+_session_lock = threading.Lock()
+
+class _Retry(Retry):
+    max_retry_after = 60
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.max_retry_after)
+
+class Session(requests.Session):
+    def __init__(self, timeout=30, retries=3, backoff=0.5, pool_connections=10, pool_maxsize=10, host_pools=None, status_forcelist=None, max_retry_after=60):
+        super().__init__()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.status_forcelist = status_forcelist or [429, 500, 502, 503, 504]
+        self.metrics = {}
+        self.limiters = {}
+        self.breakers = {}
+        self._metrics_lock = threading.Lock()
+        adapter = self._adapter(pool_connections, pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        if host_pools:
+            for host, pool_size in host_pools.items():
+                self.set_pool(host, pool_size)
+        self.hooks["response"].append(self._record)
+
+    def _adapter(self, pool_connections, pool_maxsize):
+        retry = _Retry(
+            total=self.retries, backoff_factor=self.backoff, status_forcelist=self.status_forcelist,
+            raise_on_status=False, respect_retry_after_header=True
+        )
+        retry.max_retry_after = self.max_retry_after
+        return HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    def set_pool(self, host, pool_size):
+        adapter = self._adapter(1, pool_size)
+        self.mount(f"https://{host}", adapter)
+        self.mount(f"http://{host}", adapter)
+
+    def limit(self, host, limiter=None, breaker=None):
+        if limiter:
+            self.limiters[host] = limiter
+        if breaker:
+            self.breakers[host] = breaker
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get("timeout", None) is None:
+            kwargs["timeout"] = self.timeout
+        host = urlparse(url).hostname
+        if host in self.limiters:
+            self.limiters[host].acquire()
+        breaker = self.breakers.get(host)
+        if not breaker:
+            return super().request(method, url, *args, **kwargs)
+        breaker.before()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            breaker.failure()
+            raise
+        except BaseException:
+            breaker.abort()
+            raise
+        if response.status_code in self.status_forcelist:
+            breaker.failure()
+        else:
+            breaker.success()
+        return response
+
+    def _record(self, response, *args, **kwargs):
+        host = urlparse(response.url).netloc
+        elapsed = response.elapsed.total_seconds()
+        with self._metrics_lock:
+            if host not in self.metrics:
+                self.metrics[host] = {"requests": 0, "errors": 0, "total": 0.0, "min": None, "max": 0.0, "last": None}
+            metric = self.metrics[host]
+            metric["requests"] += 1
+            if response.status_code >= 400:
+                metric["errors"] += 1
+            metric["total"] += elapsed
+            metric["min"] = elapsed if metric["min"] is None else min(metric["min"], elapsed)
+            metric["max"] = max(metric["max"], elapsed)
+            metric["last"] = time.time()
+
+    def stats(self, host=None):
+        with self._metrics_lock:
+            output = {}
+            for h, metric in self.metrics.items():
+                if host is None or h == host:
+                    output[h] = {**metric, "average": metric["total"] / metric["requests"] if metric["requests"] else 0.0}
+            return output
+
+def session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = Session()
+    return _session
+
+def set_session(new_session):
+    global _session
+    with _session_lock:
+        _session = new_session
+
+def get(url, **kwargs):
+    return session().get(url, **kwargs)
+
+def post(url, **kwargs):
+    return session().post(url, **kwargs)
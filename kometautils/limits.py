@@ -0,0 +1,156 @@
+import sqlite3, threading, time
+from functools import wraps
+from urllib.parse import urlparse
+from .exceptions import Failed, TimeoutExpired
+
+class RateLimiter:
+    def __init__(self, rate, per=1, burst=None, name=None):
+        self.rate = rate / per
+        self.capacity = burst or rate
+        self.name = name
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1, timeout=None):
+        if tokens > self.capacity:
+            raise Failed(f"Rate Limit Error: {tokens} tokens is more than the burst of {self.capacity}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while wait := self._take(tokens):
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise TimeoutExpired(f"Rate Limit Error: {self.name or 'Limiter'} could not acquire a token within {timeout} seconds")
+            time.sleep(wait)
+        return True
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self.acquire()
+            return func(*args, **kwargs)
+        return wrapper
+
+class SQLiteRateLimiter(RateLimiter):
+    def __init__(self, path, key, rate, per=1, burst=None):
+        super().__init__(rate, per=per, burst=burst, name=key)
+        self.path = str(path)
+        self.key = key
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+
+    def _connection(self):
+        if not hasattr(self._local, "connection"):
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return self._local.connection
+
+    def _take(self, tokens):
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT tokens, updated FROM rate_limits WHERE key = ?", (self.key,)).fetchone()
+            now = time.time()
+            current = self.capacity if row is None else min(self.capacity, row[0] + max(now - row[1], 0) * self.rate)
+            wait = 0
+            if current >= tokens:
+                current -= tokens
+            else:
+                wait = (tokens - current) / self.rate
+            connection.execute("INSERT OR REPLACE INTO rate_limits (key, tokens, updated) VALUES (?, ?, ?)", (self.key, current, now))
+        return wait
+
+class HostRateLimiter:
+    def __init__(self, limits=None, default=None):
+        self.limiters = {}
+        self.default = default
+        self._lock = threading.Lock()
+        for host, limiter in (limits or {}).items():
+            self.limiters[host] = limiter if isinstance(limiter, RateLimiter) else RateLimiter(*limiter, name=host)
+
+    def get(self, url_or_host):
+        host = urlparse(url_or_host).hostname if "://" in url_or_host else url_or_host
+        with self._lock:
+            if host not in self.limiters and self.default:
+                self.limiters[host] = RateLimiter(*self.default, name=host)
+            return self.limiters.get(host)
+
+    def acquire(self, url_or_host, tokens=1, timeout=None):
+        limiter = self.get(url_or_host)
+        return limiter.acquire(tokens=tokens, timeout=timeout) if limiter else True
+
+class CircuitBreaker:
+    def __init__(self, failures=5, reset=60, exceptions=(Exception,), name=None):
+        self.max_failures = failures
+        self.reset = reset
+        self.exceptions = exceptions
+        self.name = name
+        self.failures = 0
+        self.state = "closed"
+        self.opened = None
+        self._lock = threading.Lock()
+
+    def before(self):
+        with self._lock:
+            if self.state == "open":
+                remaining = self.reset - (time.monotonic() - self.opened)
+                if remaining > 0:
+                    raise Failed(f"Circuit Open: {self.name or 'Service'} failed {self.failures} times, retrying in {remaining:.0f} seconds")
+                self.state = "half_open"
+            elif self.state == "half_open":
+                raise Failed(f"Circuit Open: {self.name or 'Service'} is being retried")
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+            self.opened = None
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.max_failures:
+                self.state = "open"
+                self.opened = time.monotonic()
+
+    def abort(self):
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self.opened = time.monotonic()
+
+    def call(self, func, *args, **kwargs):
+        self.before()
+        try:
+            result = func(*args, **kwargs)
+        except self.exceptions:
+            self.failure()
+            raise
+        except BaseException:
+            self.abort()
+            raise
+        self.success()
+        return result
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        return wrapper
@@ -1,4 +1,4 @@
-import logging, platform, psutil, requests, sys, traceback
+import logging, platform, sys, traceback
 from datetime import datetime
 from functools import cached_property
 from json import JSONDecodeError
@@ -35,6 +35,29 @@ class Stat:
         self.name = name
         self.start = datetime.now()
         self.stats = {}
+        self.samples = 0
+        self.resources = {}
+        self.warned = set()
+        self.timings = {}
+
+    def add_sample(self, sample):
+        self.samples += 1
+        for metric, value in sample.items():
+            if metric not in self.resources:
+                self.resources[metric] = {"first": value, "last": value, "peak": value, "total": 0}
+            resource = self.resources[metric]
+            resource["last"] = value
+            resource["peak"] = max(resource["peak"], value)
+            resource["total"] += value
+
+    def add_timing(self, key, seconds):
+        if key not in self.timings:
+            self.timings[key] = {"count": 0, "total": 0.0, "min": seconds, "max": seconds}
+        timing = self.timings[key]
+        timing["count"] += 1
+        timing["total"] += seconds
+        timing["min"] = min(timing["min"], seconds)
+        timing["max"] = max(timing["max"], seconds)
 
     def __getitem__(self, key):
         if key in self.stats:
@@ -103,6 +126,7 @@ class KometaLogger:
         self._formatter(handler=self.cmd_handler)
         self._logger.addHandler(self.cmd_handler)
         self.main_handler = None
+        self.monitor = None
         self.old__log = self._logger._log
         self._logger._log = self.new__log
 
@@ -373,9 +397,11 @@ class KometaLogger:
                             field["inline"] = True
                         fields.append(field)
                 embed["fields"] = fields
+            import requests
+            from . import http
             try:
                 json = {"embeds": [embed], "username": self.bot_name, "avatar_url": self.bot_image_url}
-                response = requests.post(self.discord_url, json=json)
+                response = http.post(self.discord_url, json=json)
                 try:
                     response_json = response.json()
                     if response.status_code >= 400:
@@ -391,7 +417,7 @@ class KometaLogger:
 
     def start(self, name=None):
         self.current = name
-        self[name] = Stat()
+        self[name] = Stat(name=name)
 
     def switch(self, name=None):
         self.current = name
@@ -416,6 +442,19 @@ class KometaLogger:
             name = self.current
         self[name][key] = value
 
+    def timing(self, key, seconds, name=None):
+        if name is None:
+            name = self.current
+        self[name].add_timing(key, seconds)
+
+    def timing_rows(self, name=None):
+        if name is None:
+            name = self.current
+        rows = []
+        for key, t in self[name].timings.items():
+            rows.append((key, f"Count: {t['count']} | Average: {t['total'] / t['count']:.3f}s | Min: {t['min']:.3f}s | Max: {t['max']:.3f}s"))
+        return [rows] if rows else []
+
     def __getitem__(self, name):
         if name in self.stats:
             return self.stats[name]
@@ -424,7 +463,7 @@ class KometaLogger:
     def __setitem__(self, key, value):
         self.stats[key] = value
 
-    def header(self, kometa_args, sub=False, discord_update=False, override=None, count=9):
+    def header(self, kometa_args, sub=False, discord_update=False, override=None, count=9, version_wait=None):
         self.add_main_handler(count=count)
         self._separator()
         self._info(" __  ___   ______   .___  ___.  _______ .___________.    ___      ", center=True)
@@ -438,7 +477,7 @@ class KometaLogger:
             self._info()
 
         self._info(f"    Version: {kometa_args.local_version} {kometa_args.system_version}")
-        if kometa_args.update_version:
+        if kometa_args.version_ready(timeout=version_wait) and kometa_args.update_version:
             if discord_update and self.discord_url:
                 self._warning("New Version Available!", log=False, discord=True, rows=[
                     [("Current", str(kometa_args.local_version)), ("Latest", kometa_args.update_version)],
@@ -446,6 +485,7 @@ class KometaLogger:
                 ])
             self._info(f"    Newest Version: {kometa_args.update_version}")
         self._info(f"    Platform: {platform.platform()}")
+        import psutil
         self._info(f"    Memory: {round(psutil.virtual_memory().total / (1024.0 ** 3))} GB")
         self._separator(debug=True)
 
@@ -454,8 +494,48 @@ class KometaLogger:
         for o in kometa_args.options:
             value = override[o["key"]] if override and o["key"] in override else kometa_args.choices[o['key']]
             self._debug(f"--{o['key']} ({o['env']}): {value}")
-
-    def report(self, title, rows, description=None, width=None, discord=False):
+        for error in kometa_args.errors:
+            self._warning(f"Invalid Option: {error}", group="Options")
+
+    def monitor_resources(self, interval=5, rss_limit=None, cpu_limit=None, discord=True):
+        from .monitor import ResourceMonitor
+        if self.monitor:
+            self.monitor.stop()
+        self.monitor = ResourceMonitor(self, interval=interval, rss_limit=rss_limit, cpu_limit=cpu_limit, discord=discord).start()
+        return self.monitor
+
+    def stop_monitor(self):
+        if self.monitor:
+            self.monitor.stop()
+            self.monitor = None
+
+    def resource_rows(self, name=None):
+        from .util import format_bytes
+        if name is None:
+            name = self.current
+        stat = self[name]
+        if not stat.samples:
+            return []
+        rows = []
+        for metric, title, fmt in [
+            ("rss", "Memory", format_bytes),
+            ("cpu", "CPU", lambda v: f"{v:.1f}%"),
+            ("fds", "Open Files", lambda v: f"{v:.0f}"),
+            ("threads", "Threads", lambda v: f"{v:.0f}")
+        ]:
+            if metric in stat.resources:
+                r = stat.resources[metric]
+                rows.append((title, f"Peak: {fmt(r['peak'])} | Average: {fmt(r['total'] / stat.samples)}"))
+        for metric, title in [("read", "I/O Read"), ("write", "I/O Write")]:
+            if metric in stat.resources:
+                rows.append((title, format_bytes(stat.resources[metric]["last"] - stat.resources[metric]["first"])))
+        return [rows]
+
+    def report(self, title, rows, description=None, width=None, discord=False, resources=False, timings=False):
+        if resources:
+            rows = rows + self.resource_rows()
+        if timings:
+            rows = rows + self.timing_rows()
         self._separator(title)
         if description:
             self._info(description)
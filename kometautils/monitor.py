@@ -0,0 +1,67 @@
+import threading
+from .exceptions import Failed
+from .util import format_bytes
+
+class ResourceMonitor:
+    def __init__(self, logger, interval=5, rss_limit=None, cpu_limit=None, discord=True):
+        import psutil
+        self.logger = logger
+        self.interval = interval
+        self.rss_limit = rss_limit
+        self.cpu_limit = cpu_limit
+        self.discord = discord
+        self.process = psutil.Process()
+        self.process.cpu_percent(interval=None)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        with self.process.oneshot():
+            sample = {"rss": self.process.memory_info().rss, "cpu": self.process.cpu_percent(interval=None), "threads": self.process.num_threads()}
+            if hasattr(self.process, "num_fds"):
+                sample["fds"] = self.process.num_fds()
+            elif hasattr(self.process, "num_handles"):
+                sample["fds"] = self.process.num_handles()
+            if hasattr(self.process, "io_counters"):
+                try:
+                    io = self.process.io_counters()
+                    sample["read"] = io.read_bytes
+                    sample["write"] = io.write_bytes
+                except Exception:
+                    pass
+        stat = self.logger[self.logger.current]
+        stat.add_sample(sample)
+        self._check(stat, sample)
+        return sample
+
+    def _check(self, stat, sample):
+        for metric, limit, text in [
+            ("rss", self.rss_limit, lambda v: f"Memory usage {format_bytes(v)} is over {format_bytes(limit)}"),
+            ("cpu", self.cpu_limit, lambda v: f"CPU usage {v:.1f}% is over {limit}%")
+        ]:
+            if limit and sample[metric] > limit and metric not in stat.warned:
+                stat.warned.add(metric)
+                try:
+                    self.logger.warning(f"Resource Warning: {text(sample[metric])}{f' during {stat.name}' if stat.name else ''}", group="Resources", discord=self.discord)
+                except Failed:
+                    pass
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                pass
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
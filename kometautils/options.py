@@ -0,0 +1,141 @@
+import argparse, json, os, re
+from functools import lru_cache
+
+bool_true = ["t", "true", "1", "y", "yes"]
+bool_false = ["f", "false", "0", "n", "no"]
+option_types = ["str", "int", "float", "bool", "list", "duration", "bytes", "enum"]
+duration_units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+duration_regex = re.compile(r"(\d+(?:\.\d+)?)\s*(ms|s|m|h|d|w)", re.IGNORECASE)
+byte_units = {"": 1, "b": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4, "p": 1024 ** 5}
+bytes_regex = re.compile(r"^(\d+(?:\.\d+)?)\s*([kmgtp]?)(?:i?b)?$", re.IGNORECASE)
+_schemas = {}
+
+def parse_bool(value, default=None):
+    if value is True or value is False:
+        return value
+    elif value.lower() in bool_true:
+        return True
+    elif value.lower() in bool_false:
+        return False
+    else:
+        return default
+
+def parse_duration(value):
+    value = str(value).strip().lower()
+    try:
+        seconds = float(value)
+    except ValueError:
+        position = 0
+        seconds = 0
+        for match in duration_regex.finditer(value):
+            if value[position:match.start()].strip():
+                break
+            seconds += float(match.group(1)) * duration_units[match.group(2)]
+            position = match.end()
+        if position == 0 or value[position:].strip():
+            raise ValueError("must be a number of seconds or a duration like 90s, 5m, 1h30m, or 2d")
+    return int(seconds) if seconds == int(seconds) else seconds
+
+def parse_bytes(value):
+    match = bytes_regex.match(str(value).strip())
+    if not match:
+        raise ValueError("must be a byte size like 512, 100KB, 1.5GB, or 2GiB")
+    return int(float(match.group(1)) * byte_units[match.group(2).lower()])
+
+def parse_list(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+@lru_cache(maxsize=1024)
+def _convert(option_type, choices, value):
+    if option_type == "int":
+        return int(value)
+    elif option_type == "float":
+        return float(value)
+    elif option_type == "bool":
+        output = parse_bool(value)
+        if output is None:
+            raise ValueError(f"must be one of {', '.join(bool_true + bool_false)}")
+        return output
+    elif option_type == "list":
+        return tuple(parse_list(value))
+    elif option_type == "duration":
+        return parse_duration(value)
+    elif option_type == "bytes":
+        return parse_bytes(value)
+    elif option_type == "enum":
+        for choice in choices:
+            if str(choice).lower() == value.strip().lower():
+                return choice
+        raise ValueError(f"must be one of {', '.join([str(c) for c in choices])}")
+    return str(value)
+
+class Option:
+    def __init__(self, option):
+        for atr in ["type", "arg", "env", "key", "help", "default"]:
+            if atr not in option:
+                raise AttributeError(f"{option} attribute must be in every option")
+        self.option = option
+        self.type = option["type"] if option["type"] in option_types else "str"
+        self.arg = option["arg"]
+        self.env = option["env"]
+        self.key = option["key"]
+        self.help = option["help"]
+        self.default = option["default"]
+        self.choices = tuple(option["choices"]) if "choices" in option else None
+        if self.type == "enum" and not self.choices:
+            raise AttributeError(f"{option} choices attribute must be in every enum option")
+
+    def add_argument(self, parser):
+        if self.type == "int":
+            parser.add_argument(f"-{self.arg}", f"--{self.key}", dest=self.key, help=self.help, type=int, default=self.default)
+        elif self.type == "bool":
+            parser.add_argument(f"-{self.arg}", f"--{self.key}", dest=self.key, help=self.help, action="store_true", default=self.default)
+        elif self.type == "str":
+            parser.add_argument(f"-{self.arg}", f"--{self.key}", dest=self.key, help=self.help)
+        else:
+            parser.add_argument(f"-{self.arg}", f"--{self.key}", dest=self.key, help=self.help, default=self.default)
+
+    def parse(self, value):
+        output = _convert(self.type, self.choices, value)
+        return list(output) if self.type == "list" else output
+
+class OptionSchema:
+    def __init__(self, options):
+        if not isinstance(options, list):
+            raise ValueError("options must be a list")
+        self.options = [Option(o) for o in options]
+        self.parser = argparse.ArgumentParser()
+        for o in self.options:
+            o.add_argument(self.parser)
+
+    def parse_args(self, args=None):
+        return self.parser.parse_args(args)
+
+    def resolve(self, args_parsed, environ=None):
+        environ = os.environ if environ is None else environ
+        choices = {}
+        errors = []
+        for o in self.options:
+            value = getattr(args_parsed, o.key)
+            if o.type not in ["str", "int", "bool"] and isinstance(value, str):
+                try:
+                    value = o.parse(value)
+                except ValueError as e:
+                    errors.append(f"--{o.key} {value!r} {e}")
+                    value = o.default
+            env_value = environ.get(o.env)
+            if env_value is not None:
+                try:
+                    value = env_value if o.type == "str" else o.parse(env_value)
+                except ValueError as e:
+                    errors.append(f"{o.env}={env_value!r} {e if o.type not in ['int', 'float'] else f'must be a valid {o.type}'}")
+            choices[o.key] = value
+        return choices, errors
+
+def compile_options(options):
+    key = json.dumps(options, sort_keys=True, default=str)
+    if key not in _schemas:
+        _schemas[key] = OptionSchema(options)
+    return _schemas[key]
@@ -1,9 +1,16 @@
-import glob, time, os, requests
+import errno, glob, hashlib, stat, time, os
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from pathvalidate import is_valid_filename, sanitize_filename
-from tqdm import tqdm
-from .exceptions import Failed
+from .exceptions import Failed, TimeoutExpired
+
+try:
+    import fcntl
+except ImportError:
+    import msvcrt
+    fcntl = None
 
 def update_send(old_send, timeout):
     def new_send(*send_args, **kwargs):
@@ -31,13 +38,98 @@ def is_locked(filepath):
                 file_object.close()
     return locked
 
+def wait_for_unlock(filepaths, timeout=None, delay=0.001, max_delay=0.5):
+    paths = [filepaths] if isinstance(filepaths, (str, Path)) else list(filepaths)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while paths := [p for p in paths if is_locked(p)]:
+        wait = max_delay if deadline is None else min(max_delay, deadline - time.monotonic())
+        if wait <= 0:
+            raise TimeoutExpired(f"Lock Error: {', '.join([str(p) for p in paths])} still locked after {timeout} seconds")
+        time.sleep(min(delay, wait))
+        delay = min(delay * 2, max_delay)
+
+@lru_cache(maxsize=65536)
+def _sanitized_filename(filename):
+    from pathvalidate import is_valid_filename, sanitize_filename
+    return None if is_valid_filename(filename) else sanitize_filename(filename)
+
+def _lock_file(handle, shared=False, blocking=False):
+    if fcntl:
+        fcntl.flock(handle.fileno(), (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB))
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+
+def _unlock_file(handle):
+    if fcntl:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _lock_path(filepath, lock_dir=None):
+    if lock_dir is None:
+        return Path(f"{filepath}.lock")
+    resolved = os.path.realpath(filepath)
+    Path(lock_dir).mkdir(parents=True, exist_ok=True)
+    return Path(lock_dir) / f"{Path(resolved).name}.{hashlib.blake2b(resolved.encode('utf-8'), digest_size=8).hexdigest()}.lock"
+
+@contextmanager
+def file_lock(filepath, shared=False, timeout=None, delay=0.001, max_delay=0.5, lock_dir=None):
+    lock_path = _lock_path(filepath, lock_dir=lock_dir)
+    handle = lock_path.open(mode="a+b")
+    try:
+        if timeout is None and fcntl:
+            _lock_file(handle, shared=shared, blocking=True)
+        else:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                try:
+                    _lock_file(handle, shared=shared)
+                    break
+                except OSError:
+                    wait = max_delay if deadline is None else min(max_delay, deadline - time.monotonic())
+                    if wait <= 0:
+                        raise TimeoutExpired(f"Lock Error: Could not lock {filepath} within {timeout} seconds")
+                    time.sleep(min(delay, wait))
+                    delay = min(delay * 2, max_delay)
+        try:
+            yield
+        finally:
+            _unlock_file(handle)
+    finally:
+        handle.close()
+
 def validate_filename(filename):
-    if not is_valid_filename(str(filename)):
-        filename = sanitize_filename(str(filename))
-    return filename
+    sanitized = _sanitized_filename(str(filename))
+    return filename if sanitized is None else sanitized
+
+def validate_filenames(filenames):
+    output = []
+    used = set()
+    for filename in filenames:
+        final = str(validate_filename(filename))
+        if final.lower() in used:
+            base, ext = os.path.splitext(final)
+            i = 1
+            while f"{base} ({i}){ext}".lower() in used:
+                i += 1
+            final = f"{base} ({i}){ext}"
+        used.add(final.lower())
+        output.append(final)
+    return output
+
+def filename_cache_info():
+    info = _sanitized_filename.cache_info()
+    total = info.hits + info.misses
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize, "hit_rate": info.hits / total if total else 0.0}
+
+def filename_cache_clear():
+    _sanitized_filename.cache_clear()
 
-def download_image(download_image_url, path, name="temp"):
-    image_response = requests.get(download_image_url)
+def download_image(download_image_url, path, name="temp", timeout=None):
+    from . import http
+    image_response = http.get(download_image_url)
     if image_response.status_code >= 400:
         raise Failed("Image Error: Image Download Failed")
     if image_response.headers["Content-Type"] not in ["image/png", "image/jpeg", "image/webp"]:
@@ -51,10 +143,54 @@ def download_image(download_image_url, path, name="temp"):
     temp_image_name = Path(path) / temp_image_name
     with temp_image_name.open(mode="wb") as handler:
         handler.write(image_response.content)
-    while is_locked(temp_image_name):
-        time.sleep(1)
+    wait_for_unlock(temp_image_name, timeout=timeout)
     return temp_image_name
 
+def atomic_write(path, content, encoding="utf-8", follow_symlinks=True, mode=None):
+    path = Path(os.path.realpath(path)) if follow_symlinks else Path(path)
+    if not follow_symlinks and path.is_symlink():
+        raise OSError(errno.ELOOP, "Refusing to replace a symlink", str(path))
+    data = content.encode(encoding) if isinstance(content, str) else content
+    temp_path = path.parent / f".{path.name}.{os.urandom(6).hex()}.tmp"
+    fd = os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        elif path.exists():
+            current = path.stat()
+            os.chmod(temp_path, current.st_mode & 0o7777)
+            if hasattr(os, "chown"):
+                try:
+                    os.chown(temp_path, current.st_uid, current.st_gid)
+                except OSError:
+                    pass
+        try:
+            os.replace(temp_path, path)
+        except OSError as e:
+            if not follow_symlinks or e.errno not in (errno.EBUSY, errno.EXDEV):
+                raise
+            with path.open(mode="wb") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            Path(temp_path).unlink(missing_ok=True)
+            return
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
 def move_path(file_path, old_base, new_base, suffix=None, append=True):
     final_path = Path(new_base) / file_path.removeprefix(old_base)[1:]
     final_path.mkdir(parents=True, exist_ok=True)
@@ -70,11 +206,51 @@ def format_bytes(byte_count):
     byte_count = int(byte_count)
     if byte_count <= 0:
         return "0 Bytes"
-    for factor, suffix in byte_levels:
-        if byte_count >= factor:
-            return f"1 {suffix}" if byte_count == factor else f"{byte_count / factor:.2f} {suffix}s"
+    factor, suffix = byte_levels[max(len(byte_levels) - 1 - (byte_count.bit_length() - 1) // 10, 0)]
+    return f"1 {suffix}" if byte_count == factor else f"{byte_count / factor:.2f} {suffix}s"
+
+def format_bytes_bulk(byte_counts):
+    return [format_bytes(b) for b in byte_counts]
+
+def _tree_size(directory):
+    total = 0
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+def directory_size(path, workers=None):
+    total = 0
+    sub_dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    sub_dirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    if len(sub_dirs) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            total += sum(executor.map(_tree_size, sub_dirs))
+    elif sub_dirs:
+        total += _tree_size(sub_dirs[0])
+    return total
 
 def copy_with_progress(src, dst, description=None):
+    from tqdm import tqdm
     size = os.path.getsize(src)
     with open(src, "rb") as fsrc:
         with open(dst, "wb") as fdst:
@@ -91,3 +267,43 @@ def in_the_last(file, days=0, seconds=0, microseconds=0, milliseconds=0, minutes
     now = datetime.now()
     current = now - timedelta(days=days, seconds=seconds, microseconds=microseconds, milliseconds=milliseconds, minutes=minutes, hours=hours, weeks=weeks)
     return current <= file_time <= now, str(now - file_time).split(".")[0]
+
+def files_in_the_last(paths, days=0, seconds=0, microseconds=0, milliseconds=0, minutes=0, hours=0, weeks=0, time_type="ctime", recursive=False, older=False):
+    if time_type not in ["ctime", "mtime", "atime"]:
+        raise Failed(f"Time Type Error: {time_type} must be ctime, mtime, or atime")
+    attr = f"st_{time_type}"
+    now = time.time()
+    cutoff = now - timedelta(days=days, seconds=seconds, microseconds=microseconds, milliseconds=milliseconds, minutes=minutes, hours=hours, weeks=weeks).total_seconds()
+
+    def _scan(directory):
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            return
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            yield from _scan(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+    def _stats():
+        if isinstance(paths, (str, Path)) and os.path.isdir(paths):
+            yield from _scan(paths)
+        else:
+            for path in [paths] if isinstance(paths, (str, Path)) else paths:
+                try:
+                    file_stat = os.stat(path, follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.S_ISREG(file_stat.st_mode):
+                    yield path, file_stat
+
+    for file_path, file_stat in _stats():
+        file_time = min(getattr(file_stat, attr), now)
+        if (cutoff <= file_time) is not older:
+            yield file_path, now - file_time
@@ -0,0 +1,87 @@
+import threading
+from pathlib import Path
+
+def _signature(path):
+    try:
+        stat = Path(path).stat()
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+def _reload_yaml(yaml_data):
+    old = yaml_data.data
+    if not yaml_data.reload():
+        return {}
+    new = yaml_data.data
+    return {k: (old.get(k), new.get(k)) for k in list(old) + [k for k in new if k not in old] if old.get(k) != new.get(k)}
+
+class ConfigWatcher:
+    def __init__(self, interval=5, logger=None):
+        self.interval = interval
+        self.logger = logger
+        self._targets = {}
+        self._callbacks = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, name, path, reload_func):
+        with self._lock:
+            self._targets[name] = [Path(path), reload_func, _signature(path)]
+
+    def remove(self, name):
+        with self._lock:
+            self._targets.pop(name, None)
+
+    def watch_args(self, kometa_args, name="args"):
+        self.add(name, kometa_args.env_path, kometa_args.reload)
+
+    def watch_yaml(self, yaml_data, name=None):
+        self.add(name or str(yaml_data.path), yaml_data.path, lambda: _reload_yaml(yaml_data))
+
+    def on_change(self, callback):
+        self._callbacks.append(callback)
+        return callback
+
+    def check(self):
+        output = {}
+        with self._lock:
+            for name, target in self._targets.items():
+                path, reload_func, old_signature = target
+                new_signature = _signature(path)
+                if new_signature == old_signature:
+                    continue
+                target[2] = new_signature
+                try:
+                    changes = reload_func()
+                except Exception as e:
+                    if self.logger:
+                        self.logger.error(f"Reload Error: {name}: {e}", group="Reload")
+                    continue
+                if changes:
+                    output[name] = changes
+        for name, changes in output.items():
+            for callback in self._callbacks:
+                try:
+                    callback(name, changes)
+                except Exception as e:
+                    if self.logger:
+                        self.logger.error(f"Reload Callback Error: {name}: {e}", group="Reload")
+        return output
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,26 +1,166 @@
-import ruamel.yaml
+import hashlib, io, os, pickle, re, ruamel.yaml, sys, threading
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from .exceptions import Failed
+from .util import atomic_write, file_lock, glob_filter
+
+class ParseCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, signature):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            entry_signature, data, size, digest = self._entries[key]
+            if entry_signature != signature:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(data), digest
+
+    def set(self, key, signature, data, digest=None):
+        data = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (signature, data, size, digest)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self.current_bytes -= self._entries.pop(key)[2]
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.current_bytes = 0
+            else:
+                resolved = str(Path(path).resolve())
+                for key in [k for k in self._entries if k[0] == resolved]:
+                    self._remove(key)
+
+    def info(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries), "bytes": self.current_bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions, "hit_rate": self.hits / total if total else 0.0
+            }
+
+parse_cache = ParseCache()
+_pure_python_logged = False
+
+def _log_pure_python():
+    global _pure_python_logged
+    if not _pure_python_logged and ruamel.yaml.main.CParser is None:
+        _pure_python_logged = True
+        from . import logging
+        message = "YAML: ruamel.yaml.clib is not installed, read only YAML will use the slower pure-Python parser"
+        if logging.logger:
+            logging.logger.debug(message)
+        else:
+            logging.logging.getLogger(__name__).debug(message)
+
+key_regex = re.compile(rb"""^( *)("(?:[^"\\]|\\.)*"|'(?:[^']|'')*'|[^\s#'"\-?%\[{][^#]*?)[ \t]*:(?:\s|$)""")
+int_regex = re.compile(r"^[-+]?[0-9]+$")
+anchor_regex = re.compile(rb"(?:^|[\s\[{,])[&*][^\s,\[\]{}]|^\s*<<\s*:", re.MULTILINE)
+
+def index_lines(lines, indent=0, start=0, end=None):
+    offset = start
+    output = []
+    for line in lines:
+        if end is not None and offset >= end:
+            break
+        match = key_regex.match(line)
+        if match and len(match.group(1)) == indent:
+            output.append((match.group(2).decode("utf-8"), offset))
+        offset += len(line)
+    last = end if end is not None else offset
+    return [(k, o, output[i + 1][1] if i + 1 < len(output) else last) for i, (k, o) in enumerate(output)]
+
+def key_value(key_text):
+    if key_text[0] in ["'", '"']:
+        return ruamel.yaml.YAML(typ="safe").load(key_text)
+    return int(key_text) if int_regex.match(key_text) else key_text
+
+def _compact_scalar(value):
+    if isinstance(value, str):
+        return sys.intern(str(value))
+    elif isinstance(value, bool):
+        return bool(value)
+    elif isinstance(value, int):
+        return int(value)
+    elif isinstance(value, float):
+        return float(value)
+    return value
+
+def compact_data(data):
+    if isinstance(data, dict):
+        return {_compact_scalar(k): compact_data(v) for k, v in data.items()}
+    elif isinstance(data, (list, tuple)):
+        items = [compact_data(v) for v in data]
+        if not items:
+            return ()
+        item_types = {type(i) for i in items}
+        if item_types == {int} and -2 ** 63 <= min(items) and max(items) < 2 ** 63:
+            return array("q", items)
+        elif item_types == {float}:
+            return array("d", items)
+        elif not any(isinstance(i, (dict, list, tuple, array)) for i in items):
+            return tuple(items)
+        return items
+    return _compact_scalar(data)
+
+def _load_worker(path, kwargs):
+    try:
+        return YAML(path=path, **kwargs)
+    except Failed as e:
+        return e
 
 class YAML:
-    def __init__(self, path=None, input_data=None, check_empty=False, create=False, start_empty=False, preserve_quotes=False):
+    lock_dir = None
+
+    def __init__(self, path=None, input_data=None, check_empty=False, create=False, start_empty=False, preserve_quotes=False, cache=False, read_only=False, snapshot=None, incremental=False, compact=False):
         self.path = Path(path) if path else path
         self.input_data = input_data
-        self.yaml = ruamel.yaml.YAML()
-        if preserve_quotes:
-            self.yaml.preserve_quotes = True
-        self.yaml.indent(mapping=2, sequence=2)
+        self.preserve_quotes = preserve_quotes
+        self.compact = compact
+        self.read_only = read_only or compact
+        self.snapshot = snapshot
+        self.incremental = incremental
+        self._hash = None
+        self._dirty = set()
+        self._all_dirty = False
+        self.yaml = self._new_yaml()
         try:
             if input_data:
-                self.data = self.yaml.load(input_data)
+                self.data = self._parse(input_data)
             else:
                 if start_empty or (create and not self.path.exists()):
                     self.path.unlink(missing_ok=True)
                     self.path.touch()
                     self.data = {}
                 else:
-                    with self.path.open(encoding="utf-8") as fp:
-                        self.data = self.yaml.load(fp)
+                    self.data = self._load_path(cache)
         except ruamel.yaml.error.YAMLError as e:
             e = str(e).replace("\n", "\n      ")
             raise Failed(f"YAML Error: {e}")
@@ -31,12 +171,149 @@ class YAML:
                 raise Failed("YAML Error: File is empty")
             self.data = {}
 
+    def _new_yaml(self):
+        if self.read_only:
+            _log_pure_python()
+        _yaml = ruamel.yaml.YAML(typ="safe") if self.read_only else ruamel.yaml.YAML()
+        if self.preserve_quotes:
+            _yaml.preserve_quotes = True
+        _yaml.indent(mapping=2, sequence=2)
+        return _yaml
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["yaml"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.yaml = self._new_yaml()
+
+    @classmethod
+    def load_many(cls, paths, processes=None, **kwargs):
+        if isinstance(paths, (str, Path)):
+            paths = sorted(glob_filter(str(paths)))
+        else:
+            paths = list(paths)
+        if processes == 1 or len(paths) < 2:
+            return [_load_worker(p, kwargs) for p in paths]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(_load_worker, p, kwargs) for p in paths]
+            results = []
+            for path, future in zip(paths, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(Failed(f"YAML Error: {path}: {e}"))
+            return results
+
+    def _parse(self, stream):
+        data = self.yaml.load(stream)
+        return compact_data(data) if self.compact else data
+
+    @staticmethod
+    def _digest(text):
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _read_path(self):
+        return self._load_text(self.path.read_text(encoding="utf-8"))
+
+    def _load_text(self, text):
+        self._hash = self._digest(text)
+        if not self.snapshot:
+            return self._parse(text)
+        snapshot_path = self._snapshot_path()
+        try:
+            if self._trusted(os.stat(snapshot_path.parent)):
+                with os.fdopen(os.open(snapshot_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0)), "rb") as fp:
+                    if self._trusted(os.fstat(fp.fileno())):
+                        digest, data = pickle.load(fp)
+                        if digest == self._hash:
+                            return data
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+            pass
+        data = self._parse(text)
+        try:
+            if self.snapshot is not True:
+                snapshot_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if self._trusted(os.stat(snapshot_path.parent)):
+                atomic_write(snapshot_path, pickle.dumps((self._hash, data), protocol=pickle.HIGHEST_PROTOCOL), follow_symlinks=False, mode=0o600)
+        except (OSError, pickle.PicklingError):
+            pass
+        return data
+
+    @staticmethod
+    def _trusted(stat):
+        if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+            return False
+        return not stat.st_mode & 0o022
+
+    def _snapshot_path(self):
+        mode = f"{'q' if self.preserve_quotes else ''}{'r' if self.read_only else ''}{'c' if self.compact else ''}"
+        name = f"{self.path.name}{f'.{mode}' if mode else ''}.pickle"
+        if self.snapshot is True:
+            return self.path.parent / f".{name}"
+        path_hash = hashlib.blake2b(str(self.path.resolve()).encode("utf-8"), digest_size=8).hexdigest()
+        return Path(self.snapshot) / f"{path_hash}-{name}"
+
+    def _load_path(self, cache):
+        if not cache:
+            return self._read_path()
+        stat = self.path.stat()
+        key = (str(self.path.resolve()), self.preserve_quotes, self.read_only, self.compact)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = parse_cache.get(key, signature)
+        if cached is None:
+            data = self._read_path()
+            parse_cache.set(key, signature, data, digest=self._hash)
+            return data
+        data, self._hash = cached
+        return data
+
+    def reload(self, force=False):
+        if not self.path or not self.path.exists():
+            return False
+        try:
+            text = self.path.read_text(encoding="utf-8")
+            if not force and self._digest(text) == self._hash:
+                return False
+            data = self._load_text(text)
+        except ruamel.yaml.error.YAMLError as e:
+            e = str(e).replace("\n", "\n      ")
+            raise Failed(f"YAML Error: {e}")
+        except Exception as e:
+            raise Failed(f"YAML Error: {e}")
+        self.data = data if data and isinstance(data, dict) else {}
+        self._dirty.clear()
+        self._all_dirty = False
+        return True
+
+    @contextmanager
+    def transaction(self, timeout=None, lock_dir=None):
+        if self.read_only:
+            raise Failed("YAML Error: Cannot save a read only YAML")
+        if not self.path:
+            raise Failed("YAML Error: Cannot lock a YAML without a path")
+        with file_lock(self.path, timeout=timeout, lock_dir=lock_dir or self.lock_dir):
+            self.reload()
+            yield self
+            self.save()
+
+    @contextmanager
+    def shared(self, timeout=None, lock_dir=None):
+        if not self.path:
+            raise Failed("YAML Error: Cannot lock a YAML without a path")
+        with file_lock(self.path, shared=True, timeout=timeout, lock_dir=lock_dir or self.lock_dir):
+            self.reload()
+            yield self
+
     def __getitem__(self, key):
         if key in self.data:
             return self.data[key]
         raise KeyError(key)
 
     def __setitem__(self, key, value):
+        self._dirty.add(key)
         self.data[key] = value
 
     def __contains__(self, key):
@@ -49,9 +326,11 @@ class YAML:
         return len(self.data)
 
     def __delitem__(self, key):
+        self._dirty.add(key)
         del self.data[key]
 
     def clear(self):
+        self._all_dirty = True
         return self.data.clear()
 
     def copy(self):
@@ -61,7 +340,9 @@ class YAML:
         return k in self.data
 
     def update(self, *args, **kwargs):
-        return self.data.update(*args, **kwargs)
+        new_data = dict(*args, **kwargs)
+        self._dirty.update(new_data)
+        return self.data.update(new_data)
 
     def keys(self):
         return self.data.keys()
@@ -73,15 +354,77 @@ class YAML:
         return self.data.items()
 
     def pop(self, *args):
+        if args:
+            self._dirty.add(args[0])
         return self.data.pop(*args)
 
+    def mark_dirty(self, *keys):
+        self._dirty.update(keys)
+
+    def _dump_section(self, key):
+        section = ruamel.yaml.comments.CommentedMap([(key, self.data[key])])
+        if isinstance(self.data, ruamel.yaml.comments.CommentedMap) and key in self.data.ca.items:
+            section.ca.items[key] = self.data.ca.items[key]
+        stream = io.StringIO()
+        self.yaml.dump(section, stream)
+        return stream.getvalue()
+
+    def _splice(self):
+        if self._all_dirty or not self._hash or not self.path.exists():
+            return None
+        text = self.path.read_text(encoding="utf-8")
+        if self._digest(text) != self._hash:
+            return None
+        raw = text.encode("utf-8")
+        if anchor_regex.search(raw):
+            return None
+        spans = {key_value(k): (s, e) for k, s, e in index_lines(raw.splitlines(keepends=True))}
+        if any(k not in spans for k in self.data if k not in self._dirty) or any(k not in self.data and k not in self._dirty for k in spans):
+            return None
+        pieces = []
+        last = 0
+        for key, (start, end) in spans.items():
+            if key in self._dirty:
+                pieces.append(raw[last:start].decode("utf-8"))
+                if key in self.data:
+                    pieces.append(self._dump_section(key))
+                last = end
+        pieces.append(raw[last:].decode("utf-8"))
+        for key in self.data:
+            if key in self._dirty and key not in spans:
+                if pieces[-1] and not pieces[-1].endswith("\n"):
+                    pieces.append("\n")
+                pieces.append(self._dump_section(key))
+        output = "".join(pieces)
+        if anchor_regex.search(output.encode("utf-8")):
+            return None
+        return output
+
     def __iter__(self):
         return iter(self.data)
 
     def save(self):
+        if self.read_only:
+            raise Failed("YAML Error: Cannot save a read only YAML")
         if self.path:
-            with self.path.open(mode="w", encoding="utf-8") as fp:
-                self.yaml.dump(self.data, fp)
+            text = None
+            if self.incremental:
+                if not self._dirty and not self._all_dirty and self._hash and self.path.exists():
+                    return False
+                text = self._splice()
+            if text is None:
+                stream = io.StringIO()
+                self.yaml.dump(self.data, stream)
+                text = stream.getvalue()
+            digest = self._digest(text)
+            self._dirty.clear()
+            self._all_dirty = False
+            if digest == self._hash and self.path.exists():
+                return False
+            atomic_write(self.path, text)
+            self._hash = digest
+            return True
+        return False
 
     @staticmethod
     def inline(data):
@@ -98,3 +441,108 @@ class YAML:
     @staticmethod
     def quote(data):
         return ruamel.yaml.scalarstring.DoubleQuotedScalarString(data)
+
+class LazyYAML:
+    def __init__(self, path, read_only=True, preserve_quotes=False, index=None):
+        self.path = Path(path)
+        self.read_only = read_only
+        if self.read_only:
+            _log_pure_python()
+        self.yaml = ruamel.yaml.YAML(typ="safe") if self.read_only else ruamel.yaml.YAML()
+        if preserve_quotes:
+            self.yaml.preserve_quotes = True
+        self._children = {}
+        if not self.path.exists():
+            raise Failed(f"YAML Error: File not found: {self.path}")
+        with self.path.open(mode="rb") as fp:
+            bom = fp.read(3)
+            fp.seek(0 if bom != b"\xef\xbb\xbf" else 3)
+            self._keys = {key_value(k): (s, e) for k, s, e in index_lines(fp, start=fp.tell())}
+        if index:
+            for key in index:
+                self._index_children(key)
+
+    def _parse(self, text):
+        try:
+            data = self.yaml.load(text)
+        except ruamel.yaml.error.YAMLError as e:
+            e = str(e).replace("\n", "\n      ")
+            raise Failed(f"YAML Error: {e}")
+        except Exception as e:
+            raise Failed(f"YAML Error: {e}")
+        if not isinstance(data, dict) or len(data) != 1:
+            raise Failed(f"YAML Error: Could not parse section in {self.path}")
+        return next(iter(data.values()))
+
+    def _read(self, fp, start, end, indent=0):
+        fp.seek(start)
+        text = fp.read(end - start).decode("utf-8")
+        if indent:
+            text = "\n".join([line[indent:] if line[:indent].isspace() else line.lstrip(" ") for line in text.split("\n")])
+        return text
+
+    def _index_children(self, key):
+        if key not in self._children:
+            start, end = self._keys[key]
+            with self.path.open(mode="rb") as fp:
+                fp.seek(start)
+                fp.readline()
+                indent = None
+                while fp.tell() < end:
+                    line = fp.readline()
+                    stripped = line.lstrip(b" ")
+                    if stripped and not stripped.startswith(b"#") and stripped.strip():
+                        indent = len(line) - len(stripped)
+                        if stripped.startswith(b"- ") or stripped.rstrip() == b"-":
+                            indent = None
+                        break
+                if not indent:
+                    raise Failed(f"YAML Error: {key} is not a block mapping")
+                fp.seek(start)
+                fp.readline()
+                self._children[key] = (indent, {key_value(k): (s, e) for k, s, e in index_lines(fp, indent=indent, start=fp.tell(), end=end)})
+        return self._children[key]
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        start, end = self._keys[key]
+        with self.path.open(mode="rb") as fp:
+            return self._parse(self._read(fp, start, end))
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __repr__(self):
+        return f"LazyYAML({self.path})"
+
+    def keys(self):
+        return self._keys.keys()
+
+    def items(self):
+        with self.path.open(mode="rb") as fp:
+            for key, (start, end) in self._keys.items():
+                yield key, self._parse(self._read(fp, start, end))
+
+    def child_keys(self, key):
+        return self._index_children(key)[1].keys()
+
+    def child(self, key, child_key):
+        indent, children = self._index_children(key)
+        if child_key not in children:
+            raise KeyError(child_key)
+        start, end = children[child_key]
+        with self.path.open(mode="rb") as fp:
+            return self._parse(self._read(fp, start, end, indent=indent))
+
+    def entries(self, key):
+        indent, children = self._index_children(key)
+        with self.path.open(mode="rb") as fp:
+            for child_key, (start, end) in children.items():
+                yield child_key, self._parse(self._read(fp, start, end, indent=indent))